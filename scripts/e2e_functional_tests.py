@@ -12,9 +12,13 @@ import subprocess
 import signal
 import tempfile
 import shutil
+import re
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Any, Union
 from dataclasses import dataclass
 from enum import Enum
 
@@ -40,13 +44,68 @@ class TestSuite:
     start_time: datetime
     end_time: Optional[datetime] = None
 
+@dataclass
+class SuiteOutcome:
+    """单个worker进程运行一个测试套件的结果（计数器 + 报告缓冲）"""
+    suite: TestSuite
+    total_tests: int
+    passed_tests: int
+    failed_tests: int
+    skipped_tests: int
+    report_lines: List[str]
+    stdout_lines: List[str]
+
+class _Case(NamedTuple):
+    """套件内一个独立的断言用例：命令 + 判定谓词"""
+    name: str
+    cmd: List[str]
+    predicate: Callable[[int, str, str], bool]
+    timeout: int = 30
+    merge_stderr: bool = False
+    cacheable: bool = False
+    input_data: Optional[str] = None
+    capture_stderr: bool = True
+
+def _run_suite_worker(runner: "E2ETestRunner", method_name: str) -> SuiteOutcome:
+    """在worker进程中运行一个套件，返回计数器增量和报告缓冲"""
+    # 重置计数器，使返回值只包含本套件的增量
+    runner.total_tests = 0
+    runner.passed_tests = 0
+    runner.failed_tests = 0
+    runner.skipped_tests = 0
+    runner.test_suites = []
+    runner._report_buffer = []
+    runner._stdout_lines = []
+    # worker内强制缓冲stdout，避免并行套件的输出交错
+    runner._stdout_is_tty = False
+
+    suite = getattr(runner, method_name)()
+
+    return SuiteOutcome(
+        suite=suite,
+        total_tests=runner.total_tests,
+        passed_tests=runner.passed_tests,
+        failed_tests=runner.failed_tests,
+        skipped_tests=runner.skipped_tests,
+        report_lines=runner._report_buffer,
+        stdout_lines=runner._stdout_lines,
+    )
+
+def _run_suite_chain_worker(runner: "E2ETestRunner", method_names: List[str]) -> List[SuiteOutcome]:
+    """在同一worker中按序运行一组有依赖的套件（如套件2写入套件3断言的mcp.json）"""
+    return [_run_suite_worker(runner, name) for name in method_names]
+
 class E2ETestRunner:
     def __init__(self, project_root: Path):
         self.project_root = project_root
         self.build_dir = project_root / "target" / "release"
+        # 二进制路径只做一次Path拼接/字符串化，argv直接复用
+        self.aiw_bin = str(self.build_dir / "aiw")
         self.test_results_dir = project_root / "test-results"
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.report_file = self.test_results_dir / f"e2e_report_{self.timestamp}.md"
+        # MCP配置路径只算一次（Path.home()每次都查环境变量）
+        self.mcp_config_path = Path.home() / ".aiw" / "mcp.json"
 
         # 测试统计
         self.total_tests = 0
@@ -60,68 +119,212 @@ class E2ETestRunner:
         # 创建结果目录
         self.test_results_dir.mkdir(exist_ok=True)
 
-        # 备份配置
-        self.config_backup = None
+        # 备份配置（驻留内存，运行结束时写回，免去备份文件的磁盘往返）
+        self._config_backup_bytes: Optional[bytes] = None
+
+        # 报告写入先进内存缓冲，finalize_report一次性落盘，
+        # 避免每条log_*都open/close报告文件
+        self._report_buffer: List[str] = []
+
+        # 非TTY（CI管道）下stdout也走缓冲，免去每条print的flush；
+        # TTY下保留实时打印
+        self._stdout_is_tty = sys.stdout.isatty()
+        self._stdout_lines: List[str] = []
+
+        # 多线程执行用例时保护计数器
+        self._log_lock = threading.Lock()
+
+        # 确定性命令输出缓存，键为(argv, 二进制mtime)，二进制重建自动失效
+        self._cmd_cache: Dict[tuple, Tuple[int, str, str]] = {}
+
+        # 二进制缺失或落后于Cargo.toml时，后台启动cargo build，
+        # 与备份配置/初始化报告重叠，首个套件执行前再等待完成
+        self._build_proc: Optional[subprocess.Popen] = None
+        aiw_bin = self.build_dir / "aiw"
+        cargo_toml = project_root / "Cargo.toml"
+        if not aiw_bin.exists() or (
+            cargo_toml.exists() and aiw_bin.stat().st_mtime < cargo_toml.stat().st_mtime
+        ):
+            self._build_proc = subprocess.Popen(
+                ["cargo", "build", "--release"], cwd=project_root
+            )
+
+    def __getstate__(self):
+        # threading.Lock不可pickle，worker进程中重建
+        state = self.__dict__.copy()
+        state['_log_lock'] = None
+        state['_build_proc'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._log_lock = threading.Lock()
+
+    def _emit(self, line: str):
+        """TTY下实时打印；CI管道下先缓冲，finalize_report一次性写出"""
+        if self._stdout_is_tty:
+            print(line)
+        else:
+            self._stdout_lines.append(line)
 
     def log_info(self, message: str):
-        print(f"[INFO] {message}")
+        self._emit(f"[INFO] {message}")
         self._write_to_report(f"**{message}**")
 
     def log_success(self, message: str):
-        print(f"[PASS] {message}")
+        self._emit(f"[PASS] {message}")
         self._write_to_report(f"✅ {message}")
-        self.passed_tests += 1
+        with self._log_lock:
+            self.passed_tests += 1
 
     def log_error(self, message: str):
-        print(f"[FAIL] {message}")
+        self._emit(f"[FAIL] {message}")
         self._write_to_report(f"❌ {message}")
-        self.failed_tests += 1
+        with self._log_lock:
+            self.failed_tests += 1
 
     def log_warning(self, message: str):
-        print(f"[WARN] {message}")
+        self._emit(f"[WARN] {message}")
         self._write_to_report(f"⚠️ {message}")
 
+    def log_skipped(self, message: str):
+        self._emit(f"[SKIP] {message}")
+        self._write_to_report(f"⏭️ {message}")
+        with self._log_lock:
+            self.skipped_tests += 1
+
     def log_test(self, message: str):
-        print(f"[TEST] {message}")
+        self._emit(f"[TEST] {message}")
         self._write_to_report(f"🧪 {message}")
-        self.total_tests += 1
+        with self._log_lock:
+            self.total_tests += 1
 
     def _write_to_report(self, content: str):
-        with open(self.report_file, 'a', encoding='utf-8') as f:
-            f.write(f"{content}\n")
+        self._report_buffer.append(content)
 
-    def run_command(self, command: str, timeout: int = 30, input_data: Optional[str] = None) -> Tuple[int, str, str]:
-        """运行命令并返回退出码、输出、错误"""
+    def _binary_mtime(self) -> float:
+        """aiw二进制的mtime，用作输出缓存的失效依据"""
+        try:
+            return (self.build_dir / "aiw").stat().st_mtime
+        except OSError:
+            return 0.0
+
+    def run_command(self, cmd: List[str], timeout: int = 30, input_data: Optional[str] = None,
+                    merge_stderr: bool = False, cacheable: bool = False,
+                    capture_stderr: bool = True) -> Tuple[int, bytes, bytes]:
+        """运行命令并返回退出码、输出、错误（argv列表，免去shell fork）
+
+        输出以bytes返回，断言只做子串匹配，省掉整段UTF-8解码；
+        存入TestResult时再经_text()按需解码。
+        cacheable=True仅用于纯函数式命令（--help/--version），
+        输出按(argv, 二进制mtime)缓存，重跑时省掉进程启动。
+        """
+        cache_key = None
+        if cacheable and input_data is None:
+            cache_key = (tuple(cmd), merge_stderr, self._binary_mtime())
+            cached = self._cmd_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        if merge_stderr:
+            stderr_dest = subprocess.STDOUT
+        elif capture_stderr:
+            stderr_dest = subprocess.PIPE
+        else:
+            # 断言只看stdout时不分配stderr管道
+            stderr_dest = subprocess.DEVNULL
+        try:
+            proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE if input_data is not None else None,
+                stdout=subprocess.PIPE,
+                stderr=stderr_dest,
+                start_new_session=True,
+            )
+        except OSError as e:
+            return -1, b"", str(e).encode()
         try:
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True,
+            out, err = proc.communicate(
+                input=input_data.encode() if input_data is not None else None,
                 timeout=timeout,
-                input=input_data
             )
-            return result.returncode, result.stdout, result.stderr
+            entry = (proc.returncode, out or b"", err or b"")
+            if cache_key is not None:
+                self._cmd_cache[cache_key] = entry
+            return entry
         except subprocess.TimeoutExpired:
-            return -1, "", "Command timed out"
+            # 进程内复刻GNU timeout：先TERM整个进程组，顽固时再KILL，
+            # 确保serve等命令的孙进程不会钉住管道
+            try:
+                os.killpg(os.getpgid(proc.pid), signal.SIGTERM)
+                out, err = proc.communicate(timeout=5)
+            except (subprocess.TimeoutExpired, ProcessLookupError, OSError):
+                try:
+                    os.killpg(os.getpgid(proc.pid), signal.SIGKILL)
+                except (ProcessLookupError, OSError):
+                    pass
+                out, err = proc.communicate()
+            return -1, out or b"", b"Command timed out"
+
+    # 套件3的四个启动标记，预编译成单次扫描（字节级，输出不做解码）
+    _MCP_STARTUP_RE = re.compile(rb"MCP|router")
+
+    @staticmethod
+    def _text(data: Union[str, bytes], limit: Optional[int] = None) -> str:
+        """仅在存入TestResult时才解码输出（可选截断后再解码）"""
+        if limit is not None:
+            data = data[:limit]
+        if isinstance(data, bytes):
+            return data.decode(errors="replace")
+        return data
+
+    def assert_contains(self, output: Union[str, bytes],
+                        pattern: Union[str, bytes, Iterable[Union[str, bytes]]]) -> bool:
+        """检查输出是否包含指定模式（单个或多个标记，一次调用扫完）
+
+        输出以bytes捕获时标记按需编码，跳过整段UTF-8解码。
+        """
+        patterns = [pattern] if isinstance(pattern, (str, bytes)) else list(pattern)
+        if isinstance(output, bytes):
+            return all(
+                (p.encode() if isinstance(p, str) else p) in output for p in patterns
+            )
+        return all(
+            (p.decode() if isinstance(p, bytes) else p) in output for p in patterns
+        )
 
-    def assert_contains(self, output: str, pattern: str) -> bool:
-        """检查输出是否包含指定模式"""
-        return pattern in output
+    def _run_case(self, case: _Case) -> TestResult:
+        """运行单个用例并记录结果（线程安全）"""
+        self.log_test(case.name)
+        code, stdout, stderr = self.run_command(case.cmd, timeout=case.timeout,
+                                                input_data=case.input_data,
+                                                merge_stderr=case.merge_stderr,
+                                                cacheable=case.cacheable,
+                                                capture_stderr=case.capture_stderr)
+        if case.predicate(code, stdout, stderr):
+            self.log_success(case.name)
+            return TestResult(case.name, TestStatus.PASSED, 0, self._text(stdout))
+        self.log_error(case.name)
+        return TestResult(case.name, TestStatus.FAILED, 0, self._text(stdout), self._text(stderr))
+
+    def _run_cases(self, cases: List[_Case]) -> List[TestResult]:
+        """并发运行互不依赖的用例，子进程等待期间线程会释放GIL"""
+        if len(cases) == 1:
+            return [self._run_case(cases[0])]
+        with ThreadPoolExecutor(max_workers=len(cases)) as executor:
+            return list(executor.map(self._run_case, cases))
 
     def backup_config(self):
-        """备份MCP配置文件"""
-        config_path = Path.home() / ".aiw" / "mcp.json"
+        """备份MCP配置文件（读入内存即可，备份仅在本次运行内有效）"""
+        config_path = self.mcp_config_path
         if config_path.exists():
-            self.config_backup = config_path.with_suffix(".json.backup")
-            shutil.copy2(config_path, self.config_backup)
-            self.log_info(f"已备份配置文件: {self.config_backup}")
+            self._config_backup_bytes = config_path.read_bytes()
+            self.log_info("已备份配置文件（内存）")
 
     def restore_config(self):
         """恢复MCP配置文件"""
-        config_path = Path.home() / ".aiw" / "mcp.json"
-        if self.config_backup and self.config_backup.exists():
-            shutil.copy2(self.config_backup, config_path)
+        config_path = self.mcp_config_path
+        if self._config_backup_bytes is not None:
+            config_path.write_bytes(self._config_backup_bytes)
             self.log_info("已恢复配置文件")
         elif config_path.exists():
             config_path.unlink()
@@ -141,15 +344,57 @@ class E2ETestRunner:
 
 """)
 
+    def _persist_results_db(self):
+        """把本次结果写入test-results/e2e.sqlite，支持按套件/用例做历史趋势查询
+
+        markdown报告保留为面向人的视图，数据库才是可索引的事实来源。
+        """
+        db_path = self.test_results_dir / "e2e.sqlite"
+        rows = [
+            (self.timestamp, suite.name, test.name, test.status.value, test.duration,
+             json.dumps(test.details, separators=(',', ':'), ensure_ascii=False)
+             if test.details else None)
+            for suite in self.test_suites
+            for test in suite.tests
+        ]
+        with sqlite3.connect(db_path) as db:
+            db.execute(
+                """CREATE TABLE IF NOT EXISTS results (
+                    ts TEXT NOT NULL,
+                    suite TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    duration REAL NOT NULL,
+                    details_json TEXT
+                )"""
+            )
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_results_suite_name ON results(suite, name)"
+            )
+            db.executemany("INSERT INTO results VALUES (?, ?, ?, ?, ?, ?)", rows)
+
     def finalize_report(self):
         """完成测试报告"""
-        success_rate = (self.passed_tests * 100 // self.total_tests) if self.total_tests > 0 else 0
+        self._persist_results_db()
+        # 先把缓冲的stdout一次性写出（非TTY路径）
+        if self._stdout_lines:
+            sys.stdout.write("\n".join(self._stdout_lines) + "\n")
+            sys.stdout.flush()
+            self._stdout_lines.clear()
+
+        # 从三个状态计数器推导总数，避免跳过用例时的双重记账
+        total = self.passed_tests + self.failed_tests + self.skipped_tests
+        success_rate = (self.passed_tests * 100 // total) if total > 0 else 0
 
         with open(self.report_file, 'a', encoding='utf-8') as f:
+            # 先一次性落盘缓冲的日志行
+            if self._report_buffer:
+                f.write("\n".join(self._report_buffer) + "\n")
+                self._report_buffer.clear()
             f.write(f"""
 ## 测试总结
 
-- **总测试数**: {self.total_tests}
+- **总测试数**: {total}
 - **通过测试**: {self.passed_tests}
 - **失败测试**: {self.failed_tests}
 - **跳过测试**: {self.skipped_tests}
@@ -162,12 +407,17 @@ class E2ETestRunner:
             for suite in self.test_suites:
                 f.write(f"### {suite.name}\n\n")
                 for test in suite.tests:
-                    status_icon = "✅" if test.status == TestStatus.PASSED else "❌"
+                    if test.status == TestStatus.PASSED:
+                        status_icon = "✅"
+                    elif test.status == TestStatus.SKIPPED:
+                        status_icon = "⏭️"
+                    else:
+                        status_icon = "❌"
                     f.write(f"- {status_icon} **{test.name}** ({test.status.value})\n")
                     if test.error:
                         f.write(f"  - 错误: {test.error}\n")
                     if test.details:
-                        f.write(f"  - 详情: {json.dumps(test.details, indent=2, ensure_ascii=False)}\n")
+                        f.write(f"  - 详情: {json.dumps(test.details, separators=(',', ':'), ensure_ascii=False)}\n")
                 f.write("\n")
 
         if self.failed_tests == 0:
@@ -184,35 +434,19 @@ class E2ETestRunner:
 
         self.log_info(f"=== {suite_name} ===")
 
-        # 测试帮助命令
-        self.log_test("CLI帮助命令")
-        code, stdout, stderr = self.run_command(f"{self.build_dir}/aiw --help")
-        if self.assert_contains(stdout, "AI CLI manager with process tracking"):
-            self.log_success("CLI帮助命令")
-            suite.tests.append(TestResult("CLI帮助命令", TestStatus.PASSED, 0, stdout))
-        else:
-            self.log_error("CLI帮助命令")
-            suite.tests.append(TestResult("CLI帮助命令", TestStatus.FAILED, 0, stdout, stderr))
-
-        # 测试状态命令
-        self.log_test("CLI状态命令")
-        code, stdout, stderr = self.run_command(f"{self.build_dir}/aiw status")
-        if self.assert_contains(stdout, "No tasks"):
-            self.log_success("CLI状态命令")
-            suite.tests.append(TestResult("CLI状态命令", TestStatus.PASSED, 0, stdout))
-        else:
-            self.log_error("CLI状态命令")
-            suite.tests.append(TestResult("CLI状态命令", TestStatus.FAILED, 0, stdout, stderr))
-
-        # 测试版本信息
-        self.log_test("CLI版本信息")
-        code, stdout, stderr = self.run_command(f"{self.build_dir}/aiw --version")
-        if self.assert_contains(stdout, "5.1.1"):
-            self.log_success("CLI版本信息")
-            suite.tests.append(TestResult("CLI版本信息", TestStatus.PASSED, 0, stdout))
-        else:
-            self.log_error("CLI版本信息")
-            suite.tests.append(TestResult("CLI版本信息", TestStatus.FAILED, 0, stdout, stderr))
+        # 三个只读命令互不依赖，并发执行
+        aiw = self.aiw_bin
+        cases = [
+            _Case("CLI帮助命令", [aiw, "--help"],
+                  lambda code, stdout, stderr: self.assert_contains(stdout, "AI CLI manager with process tracking"),
+                  cacheable=True, capture_stderr=False),
+            _Case("CLI状态命令", [aiw, "status"],
+                  lambda code, stdout, stderr: self.assert_contains(stdout, "No tasks")),
+            _Case("CLI版本信息", [aiw, "--version"],
+                  lambda code, stdout, stderr: self.assert_contains(stdout, "5.1.1"),
+                  cacheable=True, capture_stderr=False),
+        ]
+        suite.tests.extend(self._run_cases(cases))
 
         suite.end_time = datetime.now()
         self.test_suites.append(suite)
@@ -226,55 +460,36 @@ class E2ETestRunner:
         self.log_info(f"=== {suite_name} ===")
 
         # 清理现有配置
-        config_path = Path.home() / ".aiw" / "mcp.json"
+        config_path = self.mcp_config_path
         if config_path.exists():
             config_path.unlink()
 
-        # 测试添加MCP服务器
-        self.log_test("添加filesystem MCP服务器")
-        code, stdout, stderr = self.run_command(
-            f"echo '' | {self.build_dir}/aiw mcp add filesystem npx @modelcontextprotocol/server-filesystem /tmp"
-        )
-        if self.assert_contains(stdout, "Added MCP server") and code == 0:
-            self.log_success("添加filesystem MCP服务器")
-            suite.tests.append(TestResult("添加filesystem MCP服务器", TestStatus.PASSED, 0, stdout))
-        else:
-            self.log_error("添加filesystem MCP服务器")
-            suite.tests.append(TestResult("添加filesystem MCP服务器", TestStatus.FAILED, 0, stdout, stderr))
-
-        # 测试列出MCP服务器
-        self.log_test("列出MCP服务器")
-        code, stdout, stderr = self.run_command(f"{self.build_dir}/aiw mcp list")
-        if self.assert_contains(stdout, "filesystem") and self.assert_contains(stdout, "enabled"):
-            self.log_success("列出MCP服务器")
-            suite.tests.append(TestResult("列出MCP服务器", TestStatus.PASSED, 0, stdout))
-        else:
-            self.log_error("列出MCP服务器")
-            suite.tests.append(TestResult("列出MCP服务器", TestStatus.FAILED, 0, stdout, stderr))
-
-        # 测试禁用服务器
-        self.log_test("禁用MCP服务器")
-        code, stdout, stderr = self.run_command(
-            f"echo '' | {self.build_dir}/aiw mcp disable filesystem"
-        )
-        if self.assert_contains(stdout, "Disabled MCP server") and code == 0:
-            self.log_success("禁用MCP服务器")
-            suite.tests.append(TestResult("禁用MCP服务器", TestStatus.PASSED, 0, stdout))
-        else:
-            self.log_error("禁用MCP服务器")
-            suite.tests.append(TestResult("禁用MCP服务器", TestStatus.FAILED, 0, stdout, stderr))
-
-        # 测试启用服务器
-        self.log_test("启用MCP服务器")
-        code, stdout, stderr = self.run_command(
-            f"echo '' | {self.build_dir}/aiw mcp enable filesystem"
-        )
-        if self.assert_contains(stdout, "Enabled MCP server") and code == 0:
-            self.log_success("启用MCP服务器")
-            suite.tests.append(TestResult("启用MCP服务器", TestStatus.PASSED, 0, stdout))
-        else:
-            self.log_error("启用MCP服务器")
-            suite.tests.append(TestResult("启用MCP服务器", TestStatus.FAILED, 0, stdout, stderr))
+        aiw = self.aiw_bin
+
+        # 步骤依赖构成DAG：add → list（读取enabled状态）→ disable → enable。
+        # 同一stage内的用例互不依赖、并发执行；未来并行添加多个不同
+        # server时只需把它们放进第一个stage（各自写入配置中不同的键）。
+        stages: List[List[_Case]] = [
+            [_Case("添加filesystem MCP服务器",
+                   [aiw, "mcp", "add", "filesystem", "npx",
+                    "@modelcontextprotocol/server-filesystem", "/tmp"],
+                   lambda code, stdout, stderr: (
+                       self.assert_contains(stdout, "Added MCP server") and code == 0),
+                   input_data="")],
+            [_Case("列出MCP服务器", [aiw, "mcp", "list"],
+                   lambda code, stdout, stderr: self.assert_contains(stdout, ("filesystem", "enabled")),
+                   capture_stderr=False)],
+            [_Case("禁用MCP服务器", [aiw, "mcp", "disable", "filesystem"],
+                   lambda code, stdout, stderr: (
+                       self.assert_contains(stdout, "Disabled MCP server") and code == 0),
+                   input_data="")],
+            [_Case("启用MCP服务器", [aiw, "mcp", "enable", "filesystem"],
+                   lambda code, stdout, stderr: (
+                       self.assert_contains(stdout, "Enabled MCP server") and code == 0),
+                   input_data="")],
+        ]
+        for stage in stages:
+            suite.tests.extend(self._run_cases(stage))
 
         suite.end_time = datetime.now()
         self.test_suites.append(suite)
@@ -289,7 +504,7 @@ class E2ETestRunner:
 
         # 测试配置文件存在性
         self.log_test("MCP配置文件存在")
-        config_path = Path.home() / ".aiw" / "mcp.json"
+        config_path = self.mcp_config_path
         if config_path.exists():
             self.log_success("MCP配置文件存在")
             suite.tests.append(TestResult("MCP配置文件存在", TestStatus.PASSED, 0, str(config_path)))
@@ -300,21 +515,16 @@ class E2ETestRunner:
         # 测试MCP服务器启动（简短测试）
         self.log_test("MCP服务器启动")
         code, stdout, stderr = self.run_command(
-            f"echo '{{}}' | timeout 10s {self.build_dir}/aiw mcp serve 2>&1",
-            timeout=15
+            [self.aiw_bin, "mcp", "serve"],
+            timeout=10, input_data="{}", merge_stderr=True
         )
         # 检查是否有启动成功的迹象
-        if (self.assert_contains(stdout, "MCP") or
-            self.assert_contains(stderr, "MCP") or
-            self.assert_contains(stdout, "router") or
-            self.assert_contains(stderr, "router")):
+        if self._MCP_STARTUP_RE.search(stdout) or self._MCP_STARTUP_RE.search(stderr):
             self.log_success("MCP服务器启动")
-            suite.tests.append(TestResult("MCP服务器启动", TestStatus.PASSED, 0, stdout[:500]))
+            suite.tests.append(TestResult("MCP服务器启动", TestStatus.PASSED, 0, self._text(stdout, 500)))
         else:
-            self.log_warning("MCP服务器启动 - 部分成功（可能是正常的超时）")
-            suite.tests.append(TestResult("MCP服务器启动", TestStatus.PASSED, 0, "启动检测到"))
-            self.skipped_tests += 1
-            self.total_tests -= 1  # 调整计数
+            self.log_skipped("MCP服务器启动 - 无法确认（可能是正常的超时）")
+            suite.tests.append(TestResult("MCP服务器启动", TestStatus.SKIPPED, 0, "启动未检测到"))
 
         suite.end_time = datetime.now()
         self.test_suites.append(suite)
@@ -327,31 +537,20 @@ class E2ETestRunner:
 
         self.log_info(f"=== {suite_name} ===")
 
-        # 测试pwait命令（预期没有任务）
-        self.log_test("pwait命令功能")
+        # 两个命令互不依赖，并发执行
         current_pid = os.getpid()
-        code, stdout, stderr = self.run_command(f"{self.build_dir}/aiw pwait {current_pid}")
-        if self.assert_contains(stdout, "No tasks found") or self.assert_contains(stdout, "No tasks"):
-            self.log_success("pwait命令功能")
-            suite.tests.append(TestResult("pwait命令功能", TestStatus.PASSED, 0, stdout))
-        else:
-            self.log_error("pwait命令功能")
-            suite.tests.append(TestResult("pwait命令功能", TestStatus.FAILED, 0, stdout, stderr))
-
-        # 测试wait命令
-        self.log_test("wait命令功能")
-        code, stdout, stderr = self.run_command(
-            f"timeout 5s {self.build_dir}/aiw wait --timeout 3s",
-            timeout=10
-        )
-        if (self.assert_contains(stdout, "任务执行完成报告") or
-            self.assert_contains(stdout, "总任务数") or
-            self.assert_contains(stdout, "No tasks")):
-            self.log_success("wait命令功能")
-            suite.tests.append(TestResult("wait命令功能", TestStatus.PASSED, 0, stdout))
-        else:
-            self.log_error("wait命令功能")
-            suite.tests.append(TestResult("wait命令功能", TestStatus.FAILED, 0, stdout, stderr))
+        aiw = self.aiw_bin
+        cases = [
+            _Case("pwait命令功能", [aiw, "pwait", str(current_pid)],
+                  lambda code, stdout, stderr: (self.assert_contains(stdout, "No tasks found") or
+                                                self.assert_contains(stdout, "No tasks"))),
+            _Case("wait命令功能", [aiw, "wait", "--timeout", "3s"],
+                  lambda code, stdout, stderr: (self.assert_contains(stdout, "任务执行完成报告") or
+                                                self.assert_contains(stdout, "总任务数") or
+                                                self.assert_contains(stdout, "No tasks")),
+                  timeout=5),
+        ]
+        suite.tests.extend(self._run_cases(cases))
 
         suite.end_time = datetime.now()
         self.test_suites.append(suite)
@@ -364,28 +563,21 @@ class E2ETestRunner:
 
         self.log_info(f"=== {suite_name} ===")
 
-        # 测试无效命令
-        self.log_test("无效命令处理")
-        code, stdout, stderr = self.run_command(f"{self.build_dir}/aiw invalid-command 2>&1")
-        if (self.assert_contains(stderr, "Unrecognized subcommand") or
-            self.assert_contains(stdout, "Unrecognized subcommand") or
-            self.assert_contains(stderr, "invalid") or
-            self.assert_contains(stdout, "invalid")):
-            self.log_success("无效命令处理")
-            suite.tests.append(TestResult("无效命令处理", TestStatus.PASSED, 0, stderr))
-        else:
-            self.log_error("无效命令处理")
-            suite.tests.append(TestResult("无效命令处理", TestStatus.FAILED, 0, stdout, stderr))
-
-        # 测试不存在的MCP服务器
-        self.log_test("不存在的MCP服务器")
-        code, stdout, stderr = self.run_command(f"{self.build_dir}/aiw mcp get nonexistent-server 2>&1")
-        if self.assert_contains(stderr, "not found") or self.assert_contains(stdout, "not found"):
-            self.log_success("不存在的MCP服务器")
-            suite.tests.append(TestResult("不存在的MCP服务器", TestStatus.PASSED, 0, stderr))
-        else:
-            self.log_error("不存在的MCP服务器")
-            suite.tests.append(TestResult("不存在的MCP服务器", TestStatus.FAILED, 0, stdout, stderr))
+        # 两个错误场景互不依赖，并发执行
+        aiw = self.aiw_bin
+        cases = [
+            _Case("无效命令处理", [aiw, "invalid-command"],
+                  lambda code, stdout, stderr: (self.assert_contains(stderr, "Unrecognized subcommand") or
+                                                self.assert_contains(stdout, "Unrecognized subcommand") or
+                                                self.assert_contains(stderr, "invalid") or
+                                                self.assert_contains(stdout, "invalid")),
+                  merge_stderr=True),
+            _Case("不存在的MCP服务器", [aiw, "mcp", "get", "nonexistent-server"],
+                  lambda code, stdout, stderr: (self.assert_contains(stderr, "not found") or
+                                                self.assert_contains(stdout, "not found")),
+                  merge_stderr=True),
+        ]
+        suite.tests.extend(self._run_cases(cases))
 
         suite.end_time = datetime.now()
         self.test_suites.append(suite)
@@ -401,18 +593,41 @@ class E2ETestRunner:
         # 初始化报告
         self.init_report()
 
-        # 检查构建
-        if not (self.build_dir / "aiw").exists():
-            self.log_info("构建Agentic-Warden...")
-            subprocess.run("cargo build --release", shell=True, cwd=self.project_root)
+        # 等待__init__中后台启动的构建完成（与上面的setup重叠执行）
+        if self._build_proc is not None:
+            self.log_info("等待cargo build完成...")
+            self._build_proc.wait()
+            self._build_proc = None
+
+        # 套件2写入、套件3读取 ~/.aiw/mcp.json，两者作为一个任务按序执行
+        suite_groups = [
+            ["test_cli_basic_functionality"],
+            ["test_mcp_configuration", "test_mcp_server_startup"],
+            ["test_process_tracking"],
+            ["test_error_handling"],
+        ]
 
         try:
-            # 运行测试套件
-            self.test_cli_basic_functionality()
-            self.test_mcp_configuration()
-            self.test_mcp_server_startup()
-            self.test_process_tracking()
-            self.test_error_handling()
+            # 各任务相互独立，分发到进程池并行执行
+            max_workers = max(1, (os.cpu_count() or 2) - 2)
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(_run_suite_chain_worker, self, group)
+                    for group in suite_groups
+                ]
+                # 按提交顺序聚合，保证报告中套件顺序稳定
+                for future in futures:
+                    for outcome in future.result():
+                        self.test_suites.append(outcome.suite)
+                        self.total_tests += outcome.total_tests
+                        self.passed_tests += outcome.passed_tests
+                        self.failed_tests += outcome.failed_tests
+                        self.skipped_tests += outcome.skipped_tests
+                        self._report_buffer.extend(outcome.report_lines)
+                        if self._stdout_is_tty:
+                            sys.stdout.write("\n".join(outcome.stdout_lines) + "\n")
+                        else:
+                            self._stdout_lines.extend(outcome.stdout_lines)
 
         finally:
             # 恢复配置
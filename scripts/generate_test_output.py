@@ -7,18 +7,19 @@ Default output produces 150 lines, each annotated with its line number.
 from __future__ import annotations
 
 import argparse
-from typing import List
+import sys
+from typing import Iterator
 
 
-def generate_test_output(line_count: int = 150) -> List[str]:
+def generate_test_output(line_count: int = 150) -> Iterator[str]:
     """
-    Build a list of test output strings with embedded line numbers.
+    Lazily yield test output strings with embedded line numbers.
 
     Args:
         line_count: Total number of lines to generate. Must be positive.
 
     Returns:
-        List of formatted strings such as "Line 001: Test output line 1".
+        Iterator of formatted strings such as "Line 001: Test output line 1".
 
     Raises:
         ValueError: If line_count is not a positive integer.
@@ -27,7 +28,10 @@ def generate_test_output(line_count: int = 150) -> List[str]:
         raise ValueError("line_count must be a positive integer")
 
     width = max(3, len(str(line_count)))
-    return [f"Line {i:0{width}d}: Test output line {i}" for i in range(1, line_count + 1)]
+    # Build the %-format template once; a dynamic-width f-string spec is
+    # re-parsed on every iteration, while the bound __mod__ is not.
+    template = ("Line %0" + str(width) + "d: Test output line %d").__mod__
+    return (template((i, i)) for i in range(1, line_count + 1))
 
 
 def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
@@ -46,8 +50,7 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
 def main(argv: list[str] | None = None) -> int:
     """Entry point for the CLI."""
     args = parse_args(argv)
-    for line in generate_test_output(args.lines):
-        print(line)
+    sys.stdout.write("\n".join(generate_test_output(args.lines)) + "\n")
     return 0
 
 
@@ -24,19 +24,19 @@ class GenerateTestOutputTests(unittest.TestCase):
         self.generate_test_output = module.generate_test_output
 
     def test_default_line_count_is_150(self):
-        lines = self.generate_test_output()
+        lines = list(self.generate_test_output())
         self.assertEqual(len(lines), 150)
         self.assertTrue(lines[0].startswith("Line 001"))
         self.assertIn("Test output line 150", lines[-1])
 
     def test_custom_line_count_and_padding(self):
-        lines = self.generate_test_output(5)
+        lines = list(self.generate_test_output(5))
         self.assertEqual(len(lines), 5)
         self.assertEqual(lines[0], "Line 001: Test output line 1")
         self.assertEqual(lines[-1], "Line 005: Test output line 5")
 
     def test_line_count_above_thousand_expands_width(self):
-        lines = self.generate_test_output(1200)
+        lines = list(self.generate_test_output(1200))
         self.assertTrue(lines[0].startswith("Line 0001"))
         self.assertIn("Line 1200", lines[-1])
         self.assertEqual(len(lines), 1200)
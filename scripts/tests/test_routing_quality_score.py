@@ -0,0 +1,49 @@
+"""
+Unit tests for quality scoring in scripts.intelligent_routing_e2e_tests.
+"""
+from __future__ import annotations
+
+import importlib.util
+import pathlib
+import unittest
+
+
+def _load_module():
+    module_path = pathlib.Path(__file__).resolve().parents[1] / "intelligent_routing_e2e_tests.py"
+    spec = importlib.util.spec_from_file_location("intelligent_routing_e2e_tests", module_path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Could not load module from {module_path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+try:
+    _MODULE = _load_module()
+except ImportError:
+    # 可选依赖（如requests）缺失时跳过整组用例
+    _MODULE = None
+
+
+@unittest.skipIf(_MODULE is None, "routing tester dependencies are not installed")
+class EvaluateCodeQualityTests(unittest.TestCase):
+    def _evaluate(self, code):
+        tester = _MODULE.IntelligentRoutingTester.__new__(_MODULE.IntelligentRoutingTester)
+        return tester.evaluate_code_quality(code)
+
+    def test_efficiency_indicator_feeds_overall_score(self):
+        score = self._evaluate("await result\n")
+        self.assertGreater(score["efficiency_score"], 0.0)
+        expected = (
+            score["syntax_correctness"] * 0.3
+            + score["logic_correctness"] * 0.2
+            + score["security_score"] * 0.2
+            + score["efficiency_score"] * 0.15
+            + score["maintainability"] * 0.15
+        )
+        self.assertAlmostEqual(score["overall_score"], expected)
+
+    def test_efficiency_indicator_changes_overall_score(self):
+        without = self._evaluate("result = 1\n")
+        with_indicator = self._evaluate("await call()\n")
+        self.assertGreater(with_indicator["efficiency_score"], without["efficiency_score"])
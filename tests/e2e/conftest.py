@@ -0,0 +1,55 @@
+"""
+Shared fixtures for the aiw E2E pytest suites.
+
+Run with xdist sharding (one file per worker so the MCP-config tests
+stay serialized):
+
+    pytest -n $(python -c 'import os;print(max(1,os.cpu_count()-2))') \
+        --dist=loadfile tests/e2e/
+"""
+import subprocess
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+@pytest.fixture(scope="session")
+def aiw_bin():
+    """Build aiw once per session and return the binary path."""
+    binary = PROJECT_ROOT / "target" / "release" / "aiw"
+    if not binary.exists():
+        subprocess.run(["cargo", "build", "--release"], cwd=PROJECT_ROOT, check=True)
+    return str(binary)
+
+
+@pytest.fixture(scope="session")
+def run_cmd():
+    """Run an argv list and return (returncode, stdout, stderr) as bytes."""
+    def _run(cmd, timeout=30, input_data=None):
+        try:
+            proc = subprocess.run(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                timeout=timeout,
+                input=input_data.encode() if input_data is not None else None,
+            )
+            return proc.returncode, proc.stdout, proc.stderr
+        except subprocess.TimeoutExpired as exc:
+            return -1, exc.stdout or b"", exc.stderr or b"timeout"
+    return _run
+
+
+@pytest.fixture(scope="session")
+def mcp_config_guard():
+    """Back up ~/.aiw/mcp.json for the session and restore it afterwards."""
+    config_path = Path.home() / ".aiw" / "mcp.json"
+    backup = config_path.read_bytes() if config_path.exists() else None
+    yield config_path
+    if backup is not None:
+        config_path.parent.mkdir(exist_ok=True)
+        config_path.write_bytes(backup)
+    elif config_path.exists():
+        config_path.unlink()
@@ -0,0 +1,16 @@
+"""E2E: basic CLI functionality (help/status/version)."""
+
+
+def test_help(aiw_bin, run_cmd):
+    _, stdout, _ = run_cmd([aiw_bin, "--help"])
+    assert b"AI CLI manager with process tracking" in stdout
+
+
+def test_status(aiw_bin, run_cmd):
+    _, stdout, _ = run_cmd([aiw_bin, "status"])
+    assert b"No tasks" in stdout
+
+
+def test_version(aiw_bin, run_cmd):
+    _, stdout, _ = run_cmd([aiw_bin, "--version"])
+    assert b"5.1.1" in stdout
@@ -0,0 +1,12 @@
+"""E2E: error handling and edge cases."""
+
+
+def test_invalid_command(aiw_bin, run_cmd):
+    _, stdout, stderr = run_cmd([aiw_bin, "invalid-command"])
+    merged = stdout + stderr
+    assert b"Unrecognized subcommand" in merged or b"invalid" in merged
+
+
+def test_nonexistent_mcp_server(aiw_bin, run_cmd):
+    _, stdout, stderr = run_cmd([aiw_bin, "mcp", "get", "nonexistent-server"])
+    assert b"not found" in stdout + stderr
@@ -0,0 +1,39 @@
+"""E2E: MCP configuration management and server startup.
+
+Both tests mutate ~/.aiw/mcp.json, so they live in one file and rely on
+--dist=loadfile to stay on a single xdist worker.
+"""
+import pytest
+
+
+def test_mcp_add_list_disable_enable(aiw_bin, run_cmd, mcp_config_guard):
+    if mcp_config_guard.exists():
+        mcp_config_guard.unlink()
+
+    code, stdout, _ = run_cmd(
+        [aiw_bin, "mcp", "add", "filesystem", "npx",
+         "@modelcontextprotocol/server-filesystem", "/tmp"],
+        input_data="",
+    )
+    assert code == 0 and b"Added MCP server" in stdout
+
+    _, stdout, _ = run_cmd([aiw_bin, "mcp", "list"])
+    assert b"filesystem" in stdout and b"enabled" in stdout
+
+    code, stdout, _ = run_cmd([aiw_bin, "mcp", "disable", "filesystem"], input_data="")
+    assert code == 0 and b"Disabled MCP server" in stdout
+
+    code, stdout, _ = run_cmd([aiw_bin, "mcp", "enable", "filesystem"], input_data="")
+    assert code == 0 and b"Enabled MCP server" in stdout
+
+
+def test_mcp_server_startup(aiw_bin, run_cmd, mcp_config_guard):
+    assert mcp_config_guard.exists()
+
+    _, stdout, stderr = run_cmd(
+        [aiw_bin, "mcp", "serve"], timeout=10, input_data="{}"
+    )
+    if not any(marker in stream
+               for marker in (b"MCP", b"router")
+               for stream in (stdout, stderr)):
+        pytest.skip("no startup marker observed (timeout is acceptable)")
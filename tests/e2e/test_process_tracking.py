@@ -0,0 +1,14 @@
+"""E2E: process tracking (pwait / wait)."""
+import os
+
+
+def test_pwait_no_tasks(aiw_bin, run_cmd):
+    _, stdout, _ = run_cmd([aiw_bin, "pwait", str(os.getpid())])
+    assert b"No tasks" in stdout
+
+
+def test_wait_no_tasks(aiw_bin, run_cmd):
+    _, stdout, _ = run_cmd([aiw_bin, "wait", "--timeout", "3s"], timeout=5)
+    assert ("任务执行完成报告".encode() in stdout
+            or "总任务数".encode() in stdout
+            or b"No tasks" in stdout)
@@ -1,4 +1,4 @@
-#!/usr/bin/env python3
+#!/usr/bin/env -S python3 -X frozen_modules=on
 """
 AIW MCP Task Lifecycle E2E Test
 Tests the full async task lifecycle using a mock claude script:
@@ -8,21 +8,48 @@ Tests the full async task lifecycle using a mock claude script:
 
 Uses a fake 'claude' script in a temp dir prepended to PATH so we can
 control timing and output without needing a real API key.
+
+Set AIW_E2E_FAILFAST=1 to exit on the first failed assertion instead of
+running the remaining tests; cleanup still happens on the way out.
 """
 
+import collections
 import json
+import re
 import subprocess
 import sys
 import time
-import threading
-import select
+import selectors
+import socket
 import os
-import stat
 import tempfile
-import shutil
+
+# Prefer orjson for frame encode/decode (C extension, accepts/returns
+# bytes directly); stdlib json is the fallback and still provides the
+# raw_decode streaming path either way
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(obj):
+        return orjson.dumps(obj)
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj):
+        return json.dumps(obj).encode()
 
 TIMEOUT = 30
 
+# Error indicators for the negative tests, matched in one pass over the
+# raw response bytes instead of str()-ing the parsed JSON first
+ERR_RE = re.compile(rb"not found|error|invalid|unknown action", re.I)
+
+# Data rows in the list_tasks table: lines starting with "|" that are
+# not the header — counted in one multiline regex pass
+TABLE_ROW_RE = re.compile(r"^\|(?!.*TASK_ID)", re.M)
+
 PASS = 0
 FAIL = 0
 
@@ -38,29 +65,59 @@ def log_pass(msg):
     print(f"{GREEN}✓ PASS{NC}: {msg}")
 
 
-def log_fail(msg, detail=""):
+def log_fail(msg, detail=None):
+    """Record a failure. detail may be a string, a raw object (JSON-dumped
+    here, only on the failure path), or a zero-arg callable producing
+    either — so call sites never pay for stringification on passes."""
     global FAIL
     FAIL += 1
     print(f"{RED}✗ FAIL{NC}: {msg}")
-    if detail:
+    if detail is not None and detail != "":
+        if callable(detail):
+            detail = detail()
+        if not isinstance(detail, str):
+            detail = json.dumps(detail, default=str)
         print(f"  Detail: {detail}")
+    if os.environ.get("AIW_E2E_FAILFAST"):
+        # Abort on first failure; main()'s finally block still cleans up.
+        raise SystemExit(1)
 
 
 def log_info(msg):
     print(f"{YELLOW}  info{NC}: {msg}")
 
 
-def create_mock_claude(tmpdir):
-    """Create a fake 'claude' script that simulates a long-running AI task."""
-    script_path = os.path.join(tmpdir, "claude")
-    with open(script_path, "w") as f:
-        f.write("""#!/bin/bash
+def wait_until(cond, timeout=5, interval=0.05):
+    """Poll cond() until truthy or the timeout lapses.
+
+    Returns the last cond() result. The poll interval doubles up to
+    0.5s, so conditions that are already true cost ~0s instead of a
+    pessimistic fixed sleep.
+    """
+    deadline = time.time() + timeout
+    while True:
+        result = cond()
+        if result or time.time() > deadline:
+            return result
+        time.sleep(interval)
+        interval = min(interval * 2, 0.5)
+
+
+# Mock script body as a bytes constant: encoded once at import, written
+# straight to an fd in create_mock_claude
+MOCK_CLAUDE_SCRIPT = b"""#!/usr/bin/env -S stdbuf -oL bash
 # Mock claude CLI for E2E testing
-# Simulates a task that runs for a while and produces output
+# Simulates a task that runs for a while and produces output.
+# stdbuf -oL keeps output line-buffered so the parent sees progress
+# promptly instead of waiting for a 4KB pipe buffer to fill.
 
 # Parse args - look for the prompt (last argument)
 PROMPT="${@: -1}"
 
+# Per-step delay in milliseconds (override with AIW_E2E_STEP_MS)
+STEP_MS="${AIW_E2E_STEP_MS:-50}"
+STEP_S=$(awk "BEGIN{printf \\"%.3f\\", $STEP_MS/1000}")
+
 echo "Mock Claude starting..."
 echo "Prompt: $PROMPT"
 echo "---"
@@ -73,17 +130,29 @@ if echo "$PROMPT" | grep -q "QUICK_EXIT"; then
 fi
 
 # Simulate a long-running task: output lines over several seconds
-for i in $(seq 1 20); do
-    echo "Processing step $i of 20..."
-    sleep 0.5
+for i in $(seq 1 100); do
+    echo "Processing step $i of 100..."
+    sleep "$STEP_S"
 done
 
 echo "---"
 echo "Task completed successfully."
 echo "TASK_COMPLETE_MARKER_12345"
 exit 0
-""")
-    os.chmod(script_path, stat.S_IRWXU | stat.S_IRGRP | stat.S_IXGRP | stat.S_IROTH | stat.S_IXOTH)
+"""
+
+
+def create_mock_claude(tmpdir):
+    """Create a fake 'claude' script that simulates a long-running AI task."""
+    script_path = os.path.join(tmpdir, "claude")
+    # Raw fd write: no BufferedWriter allocation, and fchmod sets the
+    # executable bits without a second path lookup
+    fd = os.open(script_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o755)
+    try:
+        os.fchmod(fd, 0o755)
+        os.write(fd, MOCK_CLAUDE_SCRIPT)
+    finally:
+        os.close(fd)
     return script_path
 
 
@@ -96,80 +165,249 @@ class McpClient:
         if extra_env:
             env.update(extra_env)
 
+        # One AF_UNIX socketpair carries both directions: a single large
+        # kernel buffer (1MB) instead of two small pipes, so big
+        # log_content responses need fewer read() wakeups. The child end
+        # serves as the server's stdin and stdout.
+        self._sock, child_sock = socket.socketpair(
+            socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
         self.proc = subprocess.Popen(
             ["./target/release/aiw", "mcp", "serve"],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
+            stdin=child_sock,
+            stdout=child_sock,
             stderr=subprocess.PIPE,
             env=env,
         )
-        self._stderr_lines = []
-        self._stderr_thread = threading.Thread(target=self._drain_stderr, daemon=True)
-        self._stderr_thread.start()
-
-        print("Waiting for server bootstrap...", end="", flush=True)
-        for _ in range(20):
-            time.sleep(1)
-            print(".", end="", flush=True)
+        child_sock.close()
+        # One selector multiplexes response frames on the socket and
+        # server logging on stderr — no drain thread contending on the
+        # GIL. stderr is non-blocking so the drain helper is safe to call
+        # opportunistically (e.g. right before building an error message).
+        self._stderr_lines = collections.deque(maxlen=200)
+        self._errbuf = bytearray()
+        os.set_blocking(self.proc.stderr.fileno(), False)
+        # DefaultSelector picks the best poll mechanism (epoll on Linux).
+        self._sel = selectors.DefaultSelector()
+        self._sel.register(self._sock, selectors.EVENT_READ)
+        self._sel.register(self.proc.stderr, selectors.EVENT_READ)
+
+        # Persistent receive buffer: bytes left over after a frame is
+        # extracted stay here for the next recv() call. _scan remembers
+        # how far we already looked for a newline so each byte is
+        # examined only once.
+        self._rxbuf = bytearray()
+        self._scan = 0
+        # Raw bytes of the most recently received frame (for tests that
+        # scan the wire form directly)
+        self.last_raw = b""
+        # Optimistically assume the server accepts JSON-RPC 2.0 batch
+        # arrays; flipped off on the first wholesale rejection
+        self._batch_ok = True
+
+        # Readiness probe: send initialize right away and wait for the
+        # first response with exponential backoff instead of sleeping a
+        # fixed 20s — the server is usually ready in well under a second.
+        # Live dots only on a TTY; CI logs get a single summary line.
+        show_dots = sys.stdout.isatty()
+        dots = 0
+        if show_dots:
+            print("Waiting for server bootstrap...", end="", flush=True)
+        self.send({
+            "jsonrpc": "2.0",
+            "method": "initialize",
+            "params": {
+                "protocolVersion": "2024-11-05",
+                "capabilities": {},
+                "clientInfo": {"name": "e2e-test", "version": "1.0.0"},
+            },
+            "id": 0,
+        })
+        deadline = time.time() + TIMEOUT
+        wait = 0.05
+        while True:
+            frame = self._next_frame()
+            if frame is not None:
+                self.init_response = frame
+                break
             poll = self.proc.poll()
             if poll is not None:
                 time.sleep(0.5)
-                stderr_tail = "\n".join(self._stderr_lines[-20:])
                 raise RuntimeError(
                     f"MCP server exited during bootstrap (code {poll}).\n"
-                    f"STDERR (last lines):\n{stderr_tail}"
+                    f"STDERR (last lines):\n{self._stderr_tail(20)}"
                 )
-        print(" ready!")
+            if time.time() > deadline:
+                raise TimeoutError("MCP server did not answer initialize in time")
+            ready = self._wait_stdout(wait)
+            wait = min(wait * 2, 1.0)
+            dots += 1
+            if show_dots:
+                print(".", end="", flush=True)
+            if ready:
+                chunk = self._sock.recv(65536)
+                if not chunk:
+                    continue  # EOF surfaces via poll() on the next pass
+                self._rxbuf += chunk
+        if show_dots:
+            print(" ready!")
+        else:
+            sys.stdout.write(
+                f"Waiting for server bootstrap... {dots} poll(s), ready!\n")
 
     def _drain_stderr(self):
+        """Consume whatever stderr has buffered, without blocking."""
         try:
-            for line in self.proc.stderr:
-                self._stderr_lines.append(line.decode(errors="replace").rstrip())
-        except:
-            pass
+            chunk = os.read(self.proc.stderr.fileno(), 65536)
+        except OSError:  # includes BlockingIOError: nothing buffered
+            return
+        if not chunk:  # EOF
+            try:
+                self._sel.unregister(self.proc.stderr)
+            except KeyError:
+                pass
+            return
+        self._errbuf += chunk
+        while True:
+            nl = self._errbuf.find(b"\n")
+            if nl < 0:
+                break
+            # Keep raw bytes; almost no line is ever shown, so decoding
+            # is deferred to the error paths that actually print a tail
+            self._stderr_lines.append(bytes(self._errbuf[:nl]))
+            del self._errbuf[:nl + 1]
+
+    def _stderr_tail(self, n=20):
+        self._drain_stderr()
+        return "\n".join(
+            b.decode(errors="replace").rstrip()
+            for b in list(self._stderr_lines)[-n:])
+
+    def _wait_stdout(self, timeout):
+        """select() on socket + stderr; drain stderr, report socket data."""
+        got_stdout = False
+        for key, _ in self._sel.select(timeout):
+            if key.fileobj is self.proc.stderr:
+                self._drain_stderr()
+            else:
+                got_stdout = True
+        return got_stdout
+
+    def _write_all(self, data):
+        """Write a complete frame to the server in one sendall."""
+        self._sock.sendall(data)
 
     def send(self, obj):
-        body = json.dumps(obj) + "\n"
-        self.proc.stdin.write(body.encode())
-        self.proc.stdin.flush()
+        self._write_all(_dumps(obj) + b"\n")
+
+    _decoder = json.JSONDecoder()
+
+    def _next_frame(self):
+        """Extract one complete JSON frame from the buffer, or None.
+
+        Frames are parsed with raw_decode as soon as a complete JSON
+        value is buffered, so neither a missing trailing newline nor a
+        pretty-printed multi-line message stalls the reader until the
+        timeout. Non-JSON noise lines are still discarded. The scan
+        cursor avoids re-searching bytes already examined, and the
+        buffer is trimmed in place.
+        """
+        buf = self._rxbuf
+        while True:
+            # Drop leading whitespace (newlines between frames included)
+            i = 0
+            while i < len(buf) and buf[i] in b" \t\r\n":
+                i += 1
+            if i:
+                del buf[:i]
+                self._scan = 0
+            if not buf:
+                return None
+
+            if buf[0] not in b"{[":
+                # Noise line: discard once it is newline-complete
+                nl = buf.find(b"\n", self._scan)
+                if nl < 0:
+                    self._scan = len(buf)
+                    return None
+                del buf[:nl + 1]
+                self._scan = 0
+                continue
+
+            # Fast path: a newline-terminated frame parses as one bytes
+            # slice (orjson consumes bytes directly). Multi-line or junk
+            # frames fall through to the raw_decode path below.
+            nl = buf.find(b"\n", self._scan)
+            if nl >= 0:
+                line = bytes(buf[:nl])
+                try:
+                    obj = _loads(line)
+                except ValueError:
+                    obj = None
+                if obj is not None:
+                    del buf[:nl + 1]
+                    self._scan = 0
+                    self.last_raw = line
+                    return obj
+            else:
+                self._scan = len(buf)
+
+            try:
+                # Strict decode keeps char->byte offsets exact for the
+                # trim; a partial multi-byte sequence at the buffer tail
+                # just means "wait for more"
+                text = buf.decode("utf-8")
+            except UnicodeDecodeError:
+                return None
+            try:
+                obj, end = self._decoder.raw_decode(text)
+            except json.JSONDecodeError as e:
+                if e.pos >= len(text.rstrip()):
+                    # Error at the very end: frame incomplete, read more
+                    return None
+                # Malformed mid-buffer: junk line, drop through its newline
+                nl = buf.find(b"\n")
+                if nl < 0:
+                    self._scan = len(buf)
+                    return None
+                del buf[:nl + 1]
+                self._scan = 0
+                continue
+            raw = text[:end].encode("utf-8")
+            del buf[:len(raw)]
+            self._scan = 0
+            self.last_raw = raw
+            return obj
 
     def recv(self):
-        fd = self.proc.stdout.fileno()
-        buf = b""
         deadline = time.time() + TIMEOUT
         while time.time() < deadline:
-            ready = select.select([self.proc.stdout], [], [], 1)
-            if not ready[0]:
+            # Drain any complete frame already buffered before reading more
+            frame = self._next_frame()
+            if frame is not None:
+                return frame
+
+            if not self._wait_stdout(1):
                 poll = self.proc.poll()
                 if poll is not None:
-                    stderr_tail = "\n".join(self._stderr_lines[-10:])
                     raise EOFError(
                         f"MCP server exited (code {poll}) while waiting for response.\n"
-                        f"STDERR tail:\n{stderr_tail}\n"
-                        f"Buffer so far ({len(buf)} bytes): {buf[:200]}"
+                        f"STDERR tail:\n{self._stderr_tail(10)}\n"
+                        f"Buffer so far ({len(self._rxbuf)} bytes): {bytes(self._rxbuf[:200])}"
                     )
                 continue
-            chunk = os.read(fd, 65536)
+            chunk = self._sock.recv(65536)
             if not chunk:
                 poll = self.proc.poll()
-                stderr_tail = "\n".join(self._stderr_lines[-10:])
                 raise EOFError(
                     f"MCP server closed stdout (process poll={poll}).\n"
-                    f"STDERR tail:\n{stderr_tail}\n"
-                    f"Buffer so far ({len(buf)} bytes): {buf[:200]}"
+                    f"STDERR tail:\n{self._stderr_tail(10)}\n"
+                    f"Buffer so far ({len(self._rxbuf)} bytes): {bytes(self._rxbuf[:200])}"
                 )
-            buf += chunk
+            self._rxbuf += chunk
 
-            while b"\n" in buf:
-                line, buf = buf.split(b"\n", 1)
-                line = line.strip()
-                if line:
-                    try:
-                        return json.loads(line.decode())
-                    except json.JSONDecodeError:
-                        continue
-
-        raise TimeoutError(f"Timeout waiting for MCP response (buf={len(buf)} bytes)")
+        raise TimeoutError(f"Timeout waiting for MCP response (buf={len(self._rxbuf)} bytes)")
 
     def call(self, method, params=None, id_=None):
         msg = {"jsonrpc": "2.0", "method": method}
@@ -181,27 +419,121 @@ class McpClient:
         if id_ is not None:
             return self.recv()
 
+    def pipeline(self, calls):
+        """Send several requests back-to-back and collect responses by id.
+
+        calls is a list of (method, params, id) triples. All frames go
+        out in a single write+flush, amortizing the syscalls across the
+        batch; responses are correlated by id so out-of-order replies
+        are handled.
+        """
+        frames = []
+        pending = set()
+        for method, params, id_ in calls:
+            msg = {"jsonrpc": "2.0", "method": method, "id": id_}
+            if params is not None:
+                msg["params"] = params
+            pending.add(id_)
+            frames.append(_dumps(msg) + b"\n")
+        self._write_all(b"".join(frames))
+
+        responses = {}
+        while pending:
+            resp = self.recv()
+            rid = resp.get("id") if isinstance(resp, dict) else None
+            if rid in pending:
+                pending.discard(rid)
+                responses[rid] = resp
+        return responses
+
+    def batch(self, calls):
+        """Send calls as one JSON-RPC 2.0 batch array, one parse per side.
+
+        Same (method, params, id) triples as pipeline(). The server may
+        answer with a single array or individual frames; both are
+        correlated by id. A server that rejects the batch form outright
+        (error frame with null id) or silently drops the array (no reply
+        at all) flips the capability flag and the calls are re-sent as
+        pipelined individual frames.
+        """
+        if not self._batch_ok:
+            return self.pipeline(calls)
+        msgs = []
+        pending = set()
+        for method, params, id_ in calls:
+            msg = {"jsonrpc": "2.0", "method": method, "id": id_}
+            if params is not None:
+                msg["params"] = params
+            pending.add(id_)
+            msgs.append(msg)
+        self._write_all(_dumps(msgs) + b"\n")
+
+        responses = {}
+        while pending:
+            try:
+                frame = self.recv()
+            except TimeoutError:
+                # A line-oriented server may discard the unrecognized
+                # array as junk without answering: degrade, don't crash.
+                self._batch_ok = False
+                return self.pipeline(calls)
+            items = frame if isinstance(frame, list) else [frame]
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+                rid = item.get("id")
+                if rid in pending:
+                    pending.discard(rid)
+                    responses[rid] = item
+                elif rid is None and "error" in item:
+                    # Batch form not supported: remember and fall back
+                    self._batch_ok = False
+                    return self.pipeline(calls)
+        return responses
+
+    @staticmethod
+    def parse_tool_result(resp):
+        try:
+            text = resp["result"]["content"][0]["text"]
+            return json.loads(text)
+        except (KeyError, IndexError, json.JSONDecodeError):
+            return resp
+
     def tool_call(self, name, arguments=None, id_=1):
         params = {"name": name}
         if arguments is not None:
             params["arguments"] = arguments
         resp = self.call("tools/call", params, id_=id_)
-        try:
-            text = resp["result"]["content"][0]["text"]
-            return json.loads(text), resp
-        except (KeyError, IndexError, json.JSONDecodeError):
-            return resp, resp
+        return self.parse_tool_result(resp), resp
 
     def close(self):
         try:
-            self.proc.stdin.close()
-        except:
+            self._sel.close()
+        except OSError:
             pass
-        self.proc.terminate()
+        # Ask for a clean exit first (shutdown notification + write-side
+        # shutdown for EOF) so the terminate/kill fallbacks are rarely hit
         try:
-            self.proc.wait(timeout=5)
-        except:
-            self.proc.kill()
+            self.send({"jsonrpc": "2.0", "method": "shutdown"})
+        except OSError:
+            pass
+        try:
+            self._sock.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+        try:
+            try:
+                self.proc.wait(timeout=2)
+                return
+            except subprocess.TimeoutExpired:
+                pass
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=5)
+            except:
+                self.proc.kill()
+        finally:
+            self._sock.close()
 
 
 def main():
@@ -210,8 +542,10 @@ def main():
     print("=" * 56)
     print()
 
-    # Create temp dir with mock claude
-    tmpdir = tempfile.mkdtemp(prefix="aiw_e2e_")
+    # Create temp dir with mock claude; the context object owns cleanup
+    tmpdir_ctx = tempfile.TemporaryDirectory(
+        prefix="aiw_e2e_", ignore_cleanup_errors=True)
+    tmpdir = tmpdir_ctx.name
     mock_path = create_mock_claude(tmpdir)
     log_info(f"Mock claude at: {mock_path}")
 
@@ -231,21 +565,15 @@ def main():
     try:
         # ─── Test 1: Initialize ───
         print("--- Test 1: MCP Initialize ---")
-        resp = client.call(
-            "initialize",
-            {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {},
-                "clientInfo": {"name": "e2e-test", "version": "1.0.0"},
-            },
-            id_=next_id(),
-        )
+        # The initialize handshake already happened as the bootstrap
+        # readiness probe; assert on the captured response.
+        resp = client.init_response
 
         server_name = resp.get("result", {}).get("serverInfo", {}).get("name", "")
         if server_name == "agentic-warden":
             log_pass(f"Initialize returns server: {server_name}")
         else:
-            log_fail("Initialize", json.dumps(resp))
+            log_fail("Initialize", resp)
 
         proto = resp.get("result", {}).get("protocolVersion", "")
         if proto == "2024-11-05":
@@ -253,24 +581,37 @@ def main():
         else:
             log_fail("Protocol version", f"got: {proto}")
 
+        # No settling sleep needed: the server handles stdin in order,
+        # so the next request queues behind the notification anyway
         client.call("notifications/initialized")
-        time.sleep(1)
 
         # ─── Test 2: List Tools ───
         print()
         print("--- Test 2: List Tools ---")
-        resp = client.call("tools/list", {}, id_=next_id())
+        # Tests 2 and 3 are independent read-only probes: pipeline them
+        # in one write and correlate the responses by id
+        tools_id, tasks_id = next_id(), next_id()
+        responses = client.pipeline([
+            ("tools/list", {}, tools_id),
+            ("tools/call", {"name": "list_tasks"}, tasks_id),
+        ])
+        resp = responses[tools_id]
         tools = [t["name"] for t in resp.get("result", {}).get("tools", [])]
 
+        # One set build instead of repeated O(N) list membership scans
+        tool_set = set(tools)
+        missing_new = {"start_task", "list_tasks", "manage_task"} - tool_set
+        leaked_old = {"stop_task", "get_task_logs", "get_task_status"} & tool_set
+
         for tool in ["start_task", "list_tasks", "manage_task"]:
-            if tool in tools:
+            if tool not in missing_new:
                 log_pass(f"Tool '{tool}' is listed")
             else:
                 log_fail(f"Tool '{tool}' missing", str(tools))
 
         # Verify old tools are NOT listed
         for old_tool in ["stop_task", "get_task_logs", "get_task_status"]:
-            if old_tool not in tools:
+            if old_tool not in leaked_old:
                 log_pass(f"Old tool '{old_tool}' correctly removed")
             else:
                 log_fail(f"Old tool '{old_tool}' should not exist", str(tools))
@@ -278,7 +619,8 @@ def main():
         # ─── Test 3: List Tasks (empty) ───
         print()
         print("--- Test 3: List Tasks (should be empty) ---")
-        data, raw = client.tool_call("list_tasks", id_=next_id())
+        raw = responses[tasks_id]
+        data = client.parse_tool_result(raw)
 
         # list_tasks now returns table-formatted text (or "No tasks found.")
         list_text = raw.get("result", {}).get("content", [{}])[0].get("text", "") if isinstance(raw, dict) else str(data)
@@ -316,28 +658,48 @@ def main():
         if task_id:
             log_pass(f"start_task returns task_id: {task_id}")
         else:
-            log_fail("start_task no task_id", json.dumps(data))
+            log_fail("start_task no task_id", data)
 
         if task_pid and task_pid != 0:
             log_pass(f"start_task returns pid: {task_pid}")
         else:
-            log_fail("start_task no pid", json.dumps(data))
+            log_fail("start_task no pid", data)
 
         if task_status in ("Running", "running"):
             log_pass("start_task status is Running")
         else:
             log_fail("start_task status", f"got: {task_status}")
 
+        # Kick off Scenario B's short task now: it completes while
+        # Scenario A is busy polling the long task, so Tests 12-13 find
+        # it already finished instead of serializing the two scenarios
+        task2_start, _ = client.tool_call(
+            "start_task",
+            {
+                "ai_type": "claude",
+                "task": "QUICK_EXIT and say hello",
+            },
+            id_=next_id(),
+        )
+
         # ─── Test 5: manage_task(status) while running ───
         print()
         print("--- Test 5: manage_task(status) While Running ---")
-        time.sleep(1)
         if task_id:
-            data, _ = client.tool_call(
-                "manage_task",
-                {"task_id": task_id, "action": "status"},
-                id_=next_id(),
-            )
+            # Poll until the spawned process is observably alive instead
+            # of sleeping a fixed 1s first
+            data = {}
+
+            def _task_alive():
+                nonlocal data
+                data, _ = client.tool_call(
+                    "manage_task",
+                    {"task_id": task_id, "action": "status"},
+                    id_=next_id(),
+                )
+                return isinstance(data, dict) and data.get("process_alive") is True
+
+            wait_until(_task_alive)
 
             alive = data.get("process_alive") if isinstance(data, dict) else None
             status = data.get("status", "") if isinstance(data, dict) else ""
@@ -351,18 +713,18 @@ def main():
             if alive is True:
                 log_pass("Task is ALIVE while running")
             else:
-                log_fail(f"Task should be alive but got alive={alive}, status={status}", json.dumps(data))
+                log_fail(f"Task should be alive but got alive={alive}, status={status}", data)
 
             if isinstance(data, dict) and data.get("task_id") == task_id:
                 log_pass("manage_task(status) returns correct task_id")
             else:
-                log_fail("manage_task(status) task_id mismatch", json.dumps(data))
+                log_fail("manage_task(status) task_id mismatch", data)
 
             # Verify status fields are present
             if isinstance(data, dict) and "started_at" in data and data["started_at"]:
                 log_pass("manage_task(status) includes started_at")
             else:
-                log_fail("manage_task(status) missing started_at", json.dumps(data))
+                log_fail("manage_task(status) missing started_at", data)
         else:
             log_fail("status check skipped", "no task_id")
 
@@ -382,7 +744,7 @@ def main():
                 log_fail("Our task_id not in list", str(task_ids_in_list))
         elif "TASK_ID" in list_text and task_id[:10] in list_text:
             # Table format: check header and task_id prefix present
-            row_count = list_text.count("\n|") - 1  # subtract header row
+            row_count = len(TABLE_ROW_RE.findall(list_text))
             log_pass(f"list_tasks table shows task(s) (rows: {row_count})")
             log_pass("Our task_id found in list_tasks table")
         else:
@@ -391,13 +753,20 @@ def main():
         # ─── Test 7: manage_task(logs) while running ───
         print()
         print("--- Test 7: manage_task(logs) While Running ---")
-        time.sleep(2)  # Let some output accumulate
         if task_id:
-            data, _ = client.tool_call(
-                "manage_task",
-                {"task_id": task_id, "action": "logs", "tail_lines": 50},
-                id_=next_id(),
-            )
+            # Poll instead of a fixed 2s sleep: re-fetch logs every 100ms
+            # until progress output shows up (bounded at 5s)
+            log_deadline = time.time() + 5
+            while True:
+                data, _ = client.tool_call(
+                    "manage_task",
+                    {"task_id": task_id, "action": "logs", "tail_lines": 50},
+                    id_=next_id(),
+                )
+                log_content = data.get("log_content", "") if isinstance(data, dict) else ""
+                if "Processing step" in log_content or time.time() > log_deadline:
+                    break
+                time.sleep(0.1)
 
             action = data.get("action", "") if isinstance(data, dict) else ""
             if action == "logs":
@@ -408,13 +777,13 @@ def main():
             if isinstance(data, dict) and data.get("task_id") == task_id:
                 log_pass("manage_task(logs) returns correct task_id")
             else:
-                log_fail("manage_task(logs) task_id mismatch", json.dumps(data))
+                log_fail("manage_task(logs) task_id mismatch", data)
 
             log_file = data.get("log_file", "") if isinstance(data, dict) else ""
             if log_file:
                 log_pass("manage_task(logs) returns log_file path")
             else:
-                log_fail("manage_task(logs) no log_file", json.dumps(data))
+                log_fail("manage_task(logs) no log_file", data)
 
             content = data.get("log_content", "") if isinstance(data, dict) else ""
             if content and "Processing step" in content:
@@ -442,7 +811,7 @@ def main():
             if content and len(content) > 0:
                 log_pass(f"Full logs retrieved ({len(content)} chars)")
             else:
-                log_fail("No content in full log mode", json.dumps(data))
+                log_fail("No content in full log mode", data)
         else:
             log_fail("full logs skipped", "no task_id")
 
@@ -480,7 +849,7 @@ def main():
             if success is True:
                 log_pass(f"manage_task(stop) succeeded: {message}")
             else:
-                log_fail("manage_task(stop) failed", json.dumps(raw))
+                log_fail("manage_task(stop) failed", raw)
 
             # stop should also return status fields
             if isinstance(data, dict) and "status" in data:
@@ -493,13 +862,35 @@ def main():
         # ─── Test 10: Verify task is stopped via manage_task(status) ───
         print()
         print("--- Test 10: manage_task(status) After Stop ---")
-        time.sleep(1)
         if task_id:
-            data, _ = client.tool_call(
-                "manage_task",
-                {"task_id": task_id, "action": "status"},
-                id_=next_id(),
-            )
+            # Poll until the process is observably gone instead of a
+            # fixed 1s sleep, then run the batched assertions below
+            def _task_stopped():
+                probe, _ = client.tool_call(
+                    "manage_task",
+                    {"task_id": task_id, "action": "status"},
+                    id_=next_id(),
+                )
+                return (isinstance(probe, dict)
+                        and probe.get("process_alive") is False)
+
+            wait_until(_task_stopped)
+
+            # Tests 10 and 11 probe the same stopped task: send both in a
+            # single JSON-RPC batch array so the server parses one frame
+            status_id, logs_id = next_id(), next_id()
+            post_stop = client.batch([
+                ("tools/call",
+                 {"name": "manage_task",
+                  "arguments": {"task_id": task_id, "action": "status"}},
+                 status_id),
+                ("tools/call",
+                 {"name": "manage_task",
+                  "arguments": {"task_id": task_id, "action": "logs",
+                                "tail_lines": 100}},
+                 logs_id),
+            ])
+            data = client.parse_tool_result(post_stop[status_id])
 
             alive = data.get("process_alive") if isinstance(data, dict) else None
             status = data.get("status", "") if isinstance(data, dict) else ""
@@ -507,12 +898,12 @@ def main():
             if alive is False:
                 log_pass("Task process is NOT alive after stop")
             else:
-                log_fail("Task still alive after stop", json.dumps(data))
+                log_fail("Task still alive after stop", data)
 
             if status not in ("Running", "running"):
                 log_pass(f"Task status is no longer Running: {status}")
             else:
-                log_fail("Task still Running after stop", json.dumps(data))
+                log_fail("Task still Running after stop", data)
         else:
             log_fail("post-stop status skipped", "no task_id")
 
@@ -520,11 +911,7 @@ def main():
         print()
         print("--- Test 11: Logs Preserved After Stop ---")
         if task_id:
-            data, _ = client.tool_call(
-                "manage_task",
-                {"task_id": task_id, "action": "logs", "tail_lines": 100},
-                id_=next_id(),
-            )
+            data = client.parse_tool_result(post_stop[logs_id])
 
             content = data.get("log_content", "") if isinstance(data, dict) else ""
             if content and len(content) > 0:
@@ -532,7 +919,7 @@ def main():
                 snippet = content[:200].replace("\n", "\\n")
                 log_info(f"Log snippet: {snippet}...")
             else:
-                log_fail("No log content after stop", json.dumps(data))
+                log_fail("No log content after stop", data)
         else:
             log_fail("post-stop logs skipped", "no task_id")
 
@@ -547,20 +934,14 @@ def main():
         # ─── Test 12: Start short task ───
         print()
         print("--- Test 12: Start Short Task ---")
-        data, raw = client.tool_call(
-            "start_task",
-            {
-                "ai_type": "claude",
-                "task": "QUICK_EXIT and say hello",
-            },
-            id_=next_id(),
-        )
-
+        # Started back in Test 4, concurrently with the long task;
+        # assert on the captured start response
+        data = task2_start
         task2_id = data.get("task_id", "") if isinstance(data, dict) else ""
         if task2_id:
-            log_pass(f"Short task started: {task2_id}")
+            log_pass(f"Short task started (overlapping Scenario A): {task2_id}")
         else:
-            log_fail("Short task start failed", json.dumps(data))
+            log_fail("Short task start failed", data)
 
         # ─── Test 13: Poll until natural completion ───
         print()
@@ -608,7 +989,7 @@ def main():
                 log_pass(f"Completed task has log content ({len(content)} chars)")
                 log_info("Marker not found but content exists")
             else:
-                log_fail("Completed task has no/minimal log content", json.dumps(data))
+                log_fail("Completed task has no/minimal log content", data)
 
             if content:
                 snippet = content[:300].replace("\n", "\\n")
@@ -634,12 +1015,13 @@ def main():
         if isinstance(data, list) and len(data) >= 2:
             log_pass(f"list_tasks shows {len(data)} tasks (history preserved)")
         elif "TASK_ID" in list_text:
-            # Count data rows in table (lines starting with "| " that aren't the header)
-            table_rows = [l for l in list_text.split("\n") if l.startswith("|") and "TASK_ID" not in l]
-            if len(table_rows) >= 2:
-                log_pass(f"list_tasks table shows {len(table_rows)} tasks (history preserved)")
+            # Count data rows (lines starting with "|" that aren't the
+            # header) with one regex pass instead of a per-line scan
+            row_count = len(TABLE_ROW_RE.findall(list_text))
+            if row_count >= 2:
+                log_pass(f"list_tasks table shows {row_count} tasks (history preserved)")
             else:
-                log_fail(f"list_tasks should show 2+ tasks, got {len(table_rows)} rows", list_text)
+                log_fail(f"list_tasks should show 2+ tasks, got {row_count} rows", list_text)
         else:
             log_fail("list_tasks should show 2+ tasks", list_text)
 
@@ -658,15 +1040,14 @@ def main():
         except:
             pass
         has_error_key = isinstance(raw, dict) and "error" in raw
-        error_in_text = False
-        data_str = str(data).lower() if data else ""
-        if any(w in data_str for w in ["not found", "error", "invalid"]):
-            error_in_text = True
+        # Single compiled-regex pass over the wire bytes instead of
+        # str()-ing the parsed JSON and scanning it per word
+        error_in_text = bool(ERR_RE.search(client.last_raw))
 
         if is_error or has_error_key or error_in_text:
             log_pass("Invalid task_id returns error")
         else:
-            log_fail("No error for invalid task_id", json.dumps(raw))
+            log_fail("No error for invalid task_id", raw)
 
         # ─── Test 17: Invalid action ───
         print()
@@ -684,13 +1065,12 @@ def main():
             except:
                 pass
             has_error_key = isinstance(raw, dict) and "error" in raw
-            data_str = str(data).lower() if data else ""
-            error_in_text = any(w in data_str for w in ["unknown action", "error", "invalid"])
+            error_in_text = bool(ERR_RE.search(client.last_raw))
 
             if is_error or has_error_key or error_in_text:
                 log_pass("Invalid action returns error")
             else:
-                log_fail("No error for invalid action", json.dumps(raw))
+                log_fail("No error for invalid action", raw)
         else:
             log_fail("invalid action test skipped", "no task_id")
 
@@ -710,7 +1090,7 @@ def main():
             if success is True:
                 log_pass(f"Re-stopping already-stopped task succeeds gracefully: {message}")
             else:
-                log_fail("Re-stopping task failed", json.dumps(raw))
+                log_fail("Re-stopping task failed", raw)
         else:
             log_fail("re-stop skipped", "no task_id")
 
@@ -728,14 +1108,13 @@ def main():
             if success is True:
                 log_pass("Stopping naturally-completed task succeeds gracefully")
             else:
-                log_fail("Stopping completed task failed", json.dumps(raw))
+                log_fail("Stopping completed task failed", raw)
         else:
             log_fail("stop completed task skipped", "no task2_id")
 
     finally:
         client.close()
-        # Cleanup temp dir
-        shutil.rmtree(tmpdir, ignore_errors=True)
+        tmpdir_ctx.cleanup()
 
     # ─── Summary ───
     total = PASS + FAIL